@@ -1,94 +1,409 @@
 import pdfplumber
+from pdfplumber.utils import extract_text
 import pandas as pd
+import xlsxwriter
 import re
 import os
+import mmap
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+from itertools import islice
 
-def extract_titles_and_footnotes(pdf_path):
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# Titles in this document reliably start with "Table", "Figure", or "Listing"
+# followed by a version number, e.g. "Table 14.1.1: ...". MULTILINE lets one
+# search over the whole page text anchor on each line. [^\S\n] is whitespace
+# that stays within a single line, so a title can never span two lines
+# (e.g. "Table 14.1.1\n: x" is not a title).
+_TITLE_RE = re.compile(r'^(?:Table|Figure|Listing)[^\S\n][\d.]+[^\S\n]?:.*', re.MULTILINE)
+# A footnote line, scanned for across the whole footer text at once. Footnotes
+# often start with "Note:" or are abbreviation definitions containing "=";
+# the standard confidential footer and page numbers (e.g. "Page 123") are
+# ignored. [^\S\n] is whitespace that stays within a single line; (?=\S)
+# stops the footnote text from starting inside leading whitespace, so a long
+# run of spaces is not rescanned once per space.
+_FOOTNOTE_LINE_RE = re.compile(
+    r'^(?!Page[^\S\n]\d)(?!.*Confidential)[^\S\n]*(?=\S)((?:Note:|.*=).*)$',
+    re.MULTILINE,
+)
+# Footnotes live below this fraction of the page height.
+_FOOTER_START = 0.60
+# Upper bound on pages per worker task. Every task re-opens the PDF, so
+# chunks are kept large enough for that cost to stay small.
+_CHUNK_PAGES = 200
+# Chunks submitted ahead of the consumer, per worker.
+_CHUNK_WINDOW = 2
+# Output column order and worksheet name.
+_COLUMNS = ["Page", "Title", "Footnotes"]
+_SHEET_NAME = "Summary"
+# How footnote lines are combined into a single cell.
+_FOOTNOTE_SEPARATOR = " | "
+_NO_FOOTNOTES = "N/A"
+
+@dataclass(frozen=True)
+class ExtractionRules:
+    """
+    The document-specific rules used to find titles and footnotes.
+
+    A document type with a different layout only needs its own instance; the
+    extraction loop itself is shared. The patterns are run over whole blocks
+    of text rather than single lines, so:
+
+    - `title_re` must be compiled with re.MULTILINE; the whole match is used
+      as the title.
+    - `footnote_line_re` must be compiled with re.MULTILINE and have a
+      capture group 1 holding the footnote text.
+    - `footer_start` is the fraction of the page height, between 0 and 1,
+      below which footnotes are looked for.
+    """
+    title_re: re.Pattern
+    footnote_line_re: re.Pattern
+    footer_start: float
+
+    def __post_init__(self):
+        if not self.title_re.flags & re.MULTILINE:
+            raise ValueError("title_re must be compiled with re.MULTILINE.")
+        if not self.footnote_line_re.flags & re.MULTILINE:
+            raise ValueError("footnote_line_re must be compiled with re.MULTILINE.")
+        if self.footnote_line_re.groups < 1:
+            raise ValueError("footnote_line_re must have a capture group for the footnote text.")
+        if not 0 <= self.footer_start < 1:
+            raise ValueError("footer_start must be a fraction of the page height in [0, 1).")
+
+# Rules for TFL mock shells, the document type this script was written for.
+TFL_RULES = ExtractionRules(_TITLE_RE, _FOOTNOTE_LINE_RE, _FOOTER_START)
+
+def extract_title_from_text(page_text, rules=TFL_RULES):
+    """
+    Returns the first title line found in the already-extracted page text,
+    or an empty string if the page has no title.
+    """
+    # A single multiline search over the page text finds the first title line
+    # without looping line by line.
+    title_match = rules.title_re.search(page_text)
+    if title_match:
+        return title_match.group(0).strip() # Assume one main title per page
+    return ""
+
+def extract_footnotes_from_text(footer_text, rules=TFL_RULES):
+    """
+    Yields the footnote lines found in the already-extracted footer text.
+    """
+    # One pass of the footnote pattern over the whole footer applies every
+    # keep/ignore rule at once, instead of several checks per line.
+    for match in rules.footnote_line_re.finditer(footer_text or ""):
+        yield match.group(1).strip()
+
+def _pdfplumber_footer_text(page, footer_top):
+    """
+    Returns the text of the footer region of a pdfplumber page.
+    """
+    # Keep the characters that reach into the footer region, as cropping the
+    # page would, and group only those into lines. Lines are not taken from
+    # the whole page: a line just above the boundary that overlaps a footer
+    # line vertically would otherwise have its characters merged into it.
+    # page.chars is parsed once and cached, so this adds no layout pass.
+    footer_chars = [char for char in page.chars if char['bottom'] > footer_top]
+    return extract_text(footer_chars)
+
+@contextmanager
+def _open_pdfplumber(pdf_path, pages=None):
+    """
+    Opens a PDF with pdfplumber through a read-only memory map.
+
+    pdfminer reads the document straight from the mapping, so its bytes stay
+    in the OS page cache, shared by every worker process, instead of being
+    buffered separately in each process.
+    """
+    with open(pdf_path, 'rb') as pdf_file, \
+            mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as pdf_map, \
+            pdfplumber.open(pdf_map, pages=pages) as pdf:
+        yield pdf
+
+def _iter_pdfplumber_pages(pdf_path, page_numbers, footer_start):
+    """
+    Yields (page number, page text, footer text callable) using pdfplumber.
+
+    Each page is parsed once; the footer text is built from that page's
+    characters selected by position, instead of cropping the page and
+    extracting its text a second time.
+    """
+    with _open_pdfplumber(pdf_path, pages=page_numbers) as pdf:
+        for page in pdf.pages:
+            footer_top = page.height * footer_start
+            yield page.page_number, page.extract_text(), partial(_pdfplumber_footer_text, page, footer_top)
+
+def _pdfium_footer_text(page, textpage, footer_start):
+    """
+    Returns the text of the footer region of a pypdfium2 page.
+    """
+    # PDF coordinates start at the bottom of the page, so the footer region
+    # is measured upwards from the bottom edge of the page box.
+    left, bottom, right, top = page.get_bbox()
+    footer_top = bottom + (top - bottom) * (1 - footer_start)
+    text = textpage.get_text_bounded(left=left, bottom=bottom, right=right, top=footer_top)
+    return text.replace('\r\n', '\n')
+
+def _iter_pdfium_pages(pdf_path, page_numbers, footer_start):
+    """
+    Yields (page number, page text, footer text callable) using pypdfium2.
+
+    This skips pdfplumber's character-level layout analysis entirely, which is
+    all this script needs since it only works with plain text.
+    """
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        for page_number in page_numbers:
+            page = pdf[page_number - 1]
+            textpage = page.get_textpage()
+            try:
+                page_text = textpage.get_text_range().replace('\r\n', '\n')
+                yield page_number, page_text, partial(_pdfium_footer_text, page, textpage, footer_start)
+            finally:
+                # The footer callable is only valid until the next page is
+                # requested; release PDFium's handles now rather than relying
+                # on finalizers during long runs.
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+def _count_pages(pdf_path, backend):
+    """
+    Returns the number of pages in the PDF, using the selected backend.
+    """
+    if backend == "pypdfium2":
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    with _open_pdfplumber(pdf_path) as pdf:
+        return len(pdf.pages)
+
+_PAGE_ITERATORS = {
+    "pdfplumber": _iter_pdfplumber_pages,
+    "pypdfium2": _iter_pdfium_pages,
+}
+
+def _process_page_range(pdf_path, page_numbers, backend, rules):
+    """
+    Extracts titles and footnotes for the given 1-based page numbers.
+
+    This runs inside a worker process, so it opens its own handle on the PDF
+    and only ever returns plain lists; PDF page objects are not picklable.
+    """
+    pages, titles, footnotes_col = [], [], []
+
+    page_iterator = _PAGE_ITERATORS[backend](pdf_path, page_numbers, rules.footer_start)
+    for page_number, page_text, footer_text in page_iterator:
+        # --- Title Identification Logic ---
+        # Text extraction (layout analysis) is the expensive step, so
+        # each region of the page is extracted exactly once and handed to the
+        # helpers as plain text.
+        title = extract_title_from_text(page_text, rules)
+
+        # Only add data if we found a title. Pages without one never need
+        # their footer extracted.
+        if not title:
+            continue
+
+        # --- Footnote Identification Logic ---
+        # Footnotes are located at the bottom of the page (by default the
+        # bottom 40%, from 60% of the page height down), where footnotes and
+        # definitions live. They are kept as a list of lines; joining them
+        # into one cell is left to whoever writes the output.
+        footnotes = list(extract_footnotes_from_text(footer_text(), rules))
+
+        pages.append(page_number)
+        titles.append(title)
+        footnotes_col.append(footnotes)
+
+    return pages, titles, footnotes_col
+
+def _iter_rows(pdf_path, chunks, workers, backend, rules):
+    """
+    Yields (page, title, footnote lines) rows for each chunk of pages, in page order.
+    """
+    if len(chunks) > 1:
+        # Only a sliding window of chunks is submitted at a time, so if the
+        # consumer falls behind, at most that many finished chunks wait in
+        # memory. Futures are consumed in submission order, so rows stay sorted
+        # by page, and the next chunk is submitted before the current one's
+        # rows are handed on so the workers stay busy.
+        window = workers * _CHUNK_WINDOW
+        remaining = iter(chunks)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque(
+                executor.submit(_process_page_range, pdf_path, chunk, backend, rules)
+                for chunk in islice(remaining, window)
+            )
+            while pending:
+                result = pending.popleft().result()
+                next_chunk = next(remaining, None)
+                if next_chunk is not None:
+                    pending.append(executor.submit(_process_page_range, pdf_path, next_chunk, backend, rules))
+                yield from zip(*result)
+    else:
+        for chunk in chunks:
+            yield from zip(*_process_page_range(pdf_path, chunk, backend, rules))
+
+    print("Extraction complete.")
+
+def iter_titles_and_footnotes(pdf_path, max_workers=None, backend="pdfplumber", rules=TFL_RULES):
     """
     Extracts titles and footnotes from each page of a PDF document.
 
     The logic identifies titles based on a specific text pattern (e.g., "Table X.X.X:")
     and identifies footnotes by scanning the bottom portion of each page for
     relevant keywords (e.g., "Note:", abbreviations).
+
+    Pages are independent, so they are split into contiguous ranges of at
+    most _CHUNK_PAGES pages and processed in parallel by up to `max_workers`
+    processes (defaults to the number of CPUs). Pass `max_workers=1` to
+    process everything in-process.
+
+    `backend` selects the text extractor: "pdfplumber" (default) or the
+    faster, optional "pypdfium2". `rules` holds the title and footnote rules
+    for the document type (defaults to TFL_RULES).
+
+    Returns an iterator of (page, title, footnote lines) rows, or None if the
+    file does not exist or the backend is unavailable. Rows are produced chunk by
+    chunk, and only a bounded window of chunks is in flight at once, so memory
+    use does not grow with the length of the document.
     """
     if not os.path.exists(pdf_path):
         print(f"Error: The file '{pdf_path}' was not found.")
         return None
 
-    extracted_data = []
-
-    with pdfplumber.open(pdf_path) as pdf:
-        print(f"Processing {len(pdf.pages)} pages from '{pdf_path}'...")
-        
-        for i, page in enumerate(pdf.pages):
-            page_number = i + 1
-            page_content = ""
-            title = ""
-            footnotes = []
-
-            # --- Title Identification Logic ---
-            # Titles in this document reliably start with "Table", "Figure", or "Listing"
-            # followed by a version number. We use a regular expression to find them.
-            text_lines = page.extract_text().split('\n')
-            
-            for line in text_lines:
-                # Regex to find patterns like "Table 14.1.1: ...", "Figure 14.2.1: ...", etc.
-                if re.match(r'^(Table|Figure|Listing)\s[\d\.]+\s?:.*', line):
-                    title = line.strip()
-                    break # Assume one main title per page
-
-            # --- Footnote Identification Logic ---
-            # Footnotes are located at the bottom of the page. We crop the bottom
-            # 40% of the page (from 60% of the page height to the bottom) to isolate
-            # the area where footnotes and definitions live.
-            page_height = page.height
-            footer_crop_box = (0, page_height * 0.60, page.width, page_height)
-            footer_text = page.crop(footer_crop_box).extract_text()
-
-            if footer_text:
-                footer_lines = footer_text.split('\n')
-                for line in footer_lines:
-                    # Ignore the standard confidential footer and page number
-                    if "Confidential" in line or re.match(r'^Page\s\d+', line):
-                        continue
-                    
-                    # Footnotes often start with "Note:" or are abbreviation definitions
-                    if line.strip().startswith("Note:") or "=" in line:
-                         footnotes.append(line.strip())
-
-            # Only add data if we found a title
-            if title:
-                extracted_data.append({
-                    "Page": page_number,
-                    "Title": title,
-                    "Footnotes": " | ".join(footnotes) if footnotes else "N/A"
-                })
+    if backend not in _PAGE_ITERATORS:
+        print(f"Error: Unknown backend '{backend}'.")
+        return None
 
-    print("Extraction complete.")
-    return extracted_data
+    if backend == "pypdfium2" and pdfium is None:
+        print("Error: The 'pypdfium2' backend requires the pypdfium2 package.")
+        return None
+
+    page_count = _count_pages(pdf_path, backend)
+
+    print(f"Processing {page_count} pages from '{pdf_path}'...")
+
+    workers = max_workers or os.cpu_count() or 1
+    chunk_size = max(1, min(_CHUNK_PAGES, -(-page_count // workers)))
+    chunks = [
+        list(range(start + 1, min(start + chunk_size, page_count) + 1))
+        for start in range(0, page_count, chunk_size)
+    ]
+
+    return _iter_rows(pdf_path, chunks, workers, backend, rules)
+
+def extract_titles_and_footnotes(pdf_path, max_workers=None, backend="pdfplumber", rules=TFL_RULES):
+    """
+    Extracts titles and footnotes from each page of a PDF document.
+
+    Takes the same arguments as iter_titles_and_footnotes, but collects every
+    row into a DataFrame with "Page", "Title" and "Footnotes" columns. Returns
+    None if the file does not exist or the backend is unavailable.
+    """
+    rows = iter_titles_and_footnotes(pdf_path, max_workers=max_workers, backend=backend, rules=rules)
+    if rows is None:
+        return None
+
+    # Accumulate each column in its own list and build the DataFrame once at
+    # the end, rather than inferring types from one dict per row.
+    pages, titles, footnotes_col = [], [], []
+    for page, title, footnotes in rows:
+        pages.append(page)
+        titles.append(title)
+        footnotes_col.append(footnotes)
 
-def save_to_excel(data, output_path):
+    # Footnotes is built as object dtype so the .str accessor below also works
+    # when no page had a title and the column is empty.
+    df = pd.DataFrame({
+        "Page": pages,
+        "Title": titles,
+        "Footnotes": pd.Series(footnotes_col, dtype=object),
+    })
+
+    # Format the footnote lists for every page in one vectorized step. Footnote
+    # lines are never empty, so an empty join means none were found. The result
+    # is cast to the Title column's dtype so both text columns share one dtype.
+    footnotes = df["Footnotes"].str.join(_FOOTNOTE_SEPARATOR).replace("", _NO_FOOTNOTES)
+    df["Footnotes"] = footnotes.astype(df["Title"].dtype)
+    return df
+
+def save_to_excel(data, output_path, output_format="xlsx"):
     """
-    Saves the extracted data to an Excel file.
+    Saves the extracted DataFrame to an Excel file.
+
+    The workbook is written with xlsxwriter. Constant-memory mode is not
+    used here: pandas writes cells column by column, and that mode silently
+    drops writes to rows it has already flushed. Pass `output_format="parquet"`
+    to write a Parquet file instead (requires pyarrow), which is much faster
+    when the output does not need to be opened in Excel.
     """
-    if not data:
+    if data is None or data.empty:
         print("No data was extracted to save.")
         return
 
-    df = pd.DataFrame(data)
-    
-    # Reorder columns for clarity
-    df = df[["Page", "Title", "Footnotes"]]
-    
-    df.to_excel(output_path, index=False)
+    if output_format == "parquet":
+        data.to_parquet(output_path, index=False)
+    elif output_format == "xlsx":
+        with pd.ExcelWriter(output_path, engine="xlsxwriter") as writer:
+            data.to_excel(writer, index=False, sheet_name=_SHEET_NAME)
+    else:
+        print(f"Error: Unknown output format '{output_format}'.")
+        return
+
+    print(f"Successfully saved data to '{output_path}'")
+
+def _format_row(row):
+    """
+    Joins a row's footnote lines into the single cell written to the output.
+    """
+    page, title, footnotes = row
+    return page, title, _FOOTNOTE_SEPARATOR.join(footnotes) or _NO_FOOTNOTES
+
+def stream_to_excel(rows, output_path):
+    """
+    Writes extracted rows to an Excel file as they are produced.
+
+    Uses xlsxwriter's constant-memory mode, so rows are flushed to disk one
+    at a time instead of building the whole sheet (or a DataFrame) in memory
+    first.
+    """
+    # Peek at the first row so no file is created when there is nothing to save.
+    rows = iter(rows or ())
+    first_row = next(rows, None)
+    if first_row is None:
+        print("No data was extracted to save.")
+        return
+
+    workbook = xlsxwriter.Workbook(output_path, {"constant_memory": True})
+    sheet = workbook.add_worksheet(_SHEET_NAME)
+    sheet.write_row(0, 0, _COLUMNS)
+    sheet.write_row(1, 0, _format_row(first_row))
+    for row_index, row in enumerate(rows, start=2):
+        sheet.write_row(row_index, 0, _format_row(row))
+    workbook.close()
+
     print(f"Successfully saved data to '{output_path}'")
 
 # --- Main Execution ---
 if __name__ == "__main__":
     PDF_FILE = "tfl_mock_shells.pdf"
     EXCEL_OUTPUT_FILE = "clinical_study_report_summary.xlsx"
+    # Use "pypdfium2" for a faster, text-only extraction (pip install pypdfium2)
+    PDF_BACKEND = "pdfplumber"
     
-    report_data = extract_titles_and_footnotes(PDF_FILE)
+    report_rows = iter_titles_and_footnotes(PDF_FILE, backend=PDF_BACKEND)
     
-    if report_data:
-        save_to_excel(report_data, EXCEL_OUTPUT_FILE)
+    stream_to_excel(report_rows, EXCEL_OUTPUT_FILE)
@@ -0,0 +1,155 @@
+import re
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pdfplumber")
+pytest.importorskip("xlsxwriter")
+pytest.importorskip("openpyxl")  # used by pandas to read the output back
+
+import extract_data
+
+
+@pytest.fixture
+def data():
+    return pd.DataFrame({
+        "Page": [2, 3, 5],
+        "Title": [
+            "Table 14.1.1: Demographics",
+            "Figure 14.2.1: Survival",
+            "Listing 16.2.1: Disposition",
+        ],
+        "Footnotes": ["Note: x | AE = Adverse Event", "N/A", "Note: y"],
+    })
+
+
+def test_save_to_excel_round_trip(data, tmp_path):
+    output_path = tmp_path / "summary.xlsx"
+
+    extract_data.save_to_excel(data, output_path)
+
+    pd.testing.assert_frame_equal(pd.read_excel(output_path, keep_default_na=False), data)
+
+
+def test_stream_to_excel_round_trip(data, tmp_path):
+    output_path = tmp_path / "summary.xlsx"
+    rows = [
+        (page, title, footnotes.split(" | ") if footnotes != "N/A" else [])
+        for page, title, footnotes in data.itertuples(index=False)
+    ]
+
+    extract_data.stream_to_excel(rows, output_path)
+
+    pd.testing.assert_frame_equal(pd.read_excel(output_path, keep_default_na=False), data)
+
+
+def test_extract_titles_and_footnotes_without_titles(monkeypatch):
+    monkeypatch.setattr(extract_data, "iter_titles_and_footnotes",
+                        lambda *args, **kwargs: iter(()))
+
+    df = extract_data.extract_titles_and_footnotes("untitled.pdf")
+
+    assert df.empty
+    assert list(df.columns) == extract_data._COLUMNS
+
+
+def test_extract_title_from_text_stays_on_one_line():
+    assert extract_data.extract_title_from_text("Table 14.1.1\n: x") == ""
+    assert (extract_data.extract_title_from_text("Header\nTable 14.1.1 : Demographics\nBody")
+            == "Table 14.1.1 : Demographics")
+
+
+def test_extraction_rules_require_multiline_patterns():
+    with pytest.raises(ValueError):
+        extract_data.ExtractionRules(re.compile(r'^Table'), extract_data._FOOTNOTE_LINE_RE, 0.6)
+    with pytest.raises(ValueError):
+        extract_data.ExtractionRules(extract_data._TITLE_RE, re.compile(r'^Note:.*', re.MULTILINE), 0.6)
+
+
+def test_footer_excludes_lines_above_the_boundary(tmp_path):
+    canvas = pytest.importorskip("reportlab.pdfgen.canvas")
+    pdf_path = tmp_path / "straddle.pdf"
+
+    # A small note just above the footer boundary overlaps, vertically, a
+    # larger footnote that straddles it; only the footnote is in the footer.
+    pdf = canvas.Canvas(str(pdf_path), pagesize=(612, 792))
+    pdf.setFont("Helvetica", 12)
+    pdf.drawString(72, 720, "Table 14.1.1: Straddle")
+    pdf.setFont("Helvetica", 6)
+    pdf.drawString(72, 792 - 473, "Note: tiny above boundary")
+    pdf.setFont("Helvetica", 14)
+    pdf.drawString(72, 792 - 480, "BMI = body mass index straddle")
+    pdf.save()
+
+    df = extract_data.extract_titles_and_footnotes(str(pdf_path), max_workers=1)
+
+    assert df["Footnotes"].tolist() == ["BMI = body mass index straddle"]
+
+
+SAMPLE_PDF = str(Path(__file__).parent / "tfl_mock_shells.pdf")
+
+SAMPLE_PAGES_AND_TITLES = [
+    (2, "Table 14.1.1: Demographics and Baseline Characteristics 4"),
+    (3, "Table 14.1.1: Demographics and Baseline Characteristics"),
+    (5, "Table 14.1.2: Medical History"),
+    (6, "Table 14.2.1: Primary Efficacy Analysis - Change from Baseline at Week 12"),
+    (7, "Table 14.3.1: Treatment-Emergent Adverse Events by System Organ Class and Preferred Term"),
+    (8, "Table 14.3.2: Summary of Laboratory Test Results - Change from Baseline"),
+    (11, "Table 14.3.3: Summary of Vital Signs - Change from Baseline"),
+    (14, "Figure 14.2.1: Primary Endpoint Over Time"),
+    (15, "Figure 14.2.2: Subgroup Analysis of Primary Endpoint"),
+    (16, "Figure 14.3.1: Adverse Events by System Organ Class"),
+    (17, "Listing 16.2.1: Patient Disposition"),
+    (18, "Listing 16.2.2: Protocol Deviations"),
+    (19, "Listing 16.2.3: Patients Excluded from Analysis Populations"),
+    (20, "Listing 16.2.4: Demographic Data"),
+    (21, "Listing 16.2.5: Concomitant Medications"),
+    (22, "Listing 16.2.6: Individual Efficacy Response Data"),
+    (23, "Listing 16.2.7: Adverse Event Listings"),
+    (24, "Listing 16.2.8: Individual Laboratory Measurements"),
+]
+
+
+@pytest.fixture(scope="module")
+def sample_data():
+    return extract_data.extract_titles_and_footnotes(SAMPLE_PDF, max_workers=1)
+
+
+def test_sample_pdf_pages_and_titles(sample_data):
+    assert list(sample_data[["Page", "Title"]].itertuples(index=False, name=None)) == SAMPLE_PAGES_AND_TITLES
+
+
+def test_sample_pdf_parallel_matches_serial(sample_data):
+    # Two workers split the 24 pages into two chunks run in a process pool.
+    parallel = extract_data.extract_titles_and_footnotes(SAMPLE_PDF, max_workers=2)
+
+    pd.testing.assert_frame_equal(parallel, sample_data)
+
+
+def test_sample_pdf_pypdfium2_matches_pdfplumber(sample_data):
+    pytest.importorskip("pypdfium2")
+
+    fast = extract_data.extract_titles_and_footnotes(SAMPLE_PDF, max_workers=1, backend="pypdfium2")
+
+    pd.testing.assert_frame_equal(fast, sample_data)
+
+
+def test_extract_titles_and_footnotes_text_dtypes_match(sample_data):
+    assert sample_data["Footnotes"].dtype == sample_data["Title"].dtype
+
+
+def test_extract_footnotes_from_text():
+    footer = "\n".join([
+        "Note: Percentages are based on N.",
+        "   AE = Adverse Event   ",
+        "Page 3 of 10 = footer",
+        "Confidential: x = y",
+        "Body text",
+        " " * 20000,
+    ])
+
+    assert list(extract_data.extract_footnotes_from_text(footer)) == [
+        "Note: Percentages are based on N.",
+        "AE = Adverse Event",
+    ]